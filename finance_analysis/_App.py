@@ -2,9 +2,12 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import yfinance as yf
+from curl_cffi import requests as curl_requests
 import plotly.graph_objects as go
 from datetime import date, timedelta
 
+from _kernels import rolling_mean, max_drawdown
+
 # --- CONSTANTS and HELPER FUNCTIONS (Integrated for stability) ---
 
 TICKERS = {
@@ -17,22 +20,42 @@ TICKERS = {
     'Tesla (Stock)': 'TSLA'
 }
 
+@st.cache_resource
+def get_yf_session():
+    """Creates one HTTP session that is reused by all Yahoo Finance requests across reruns."""
+    # yfinance only accepts curl_cffi sessions; plain requests sessions are rejected
+    return curl_requests.Session(impersonate="chrome")
+
 @st.cache_data(ttl=60*60*4) 
 def get_historical_data(ticker, start_date, end_date):
-    """Fetches historical price data (OHLCV) from Yahoo Finance API."""
+    """Fetches OHLC prices for the chart and compact (Adjusted) Close prices for the metrics."""
+    empty_result = (pd.DataFrame(), np.empty(0, dtype=np.float32))
     try:
-        data = yf.download(ticker, start=start_date, end=end_date, progress=False)
-        return data
+        data = yf.download(ticker, start=start_date, end=end_date, progress=False,
+                           threads=True, group_by='column', auto_adjust=False,
+                           session=get_yf_session())
     except Exception as e:
         st.error(f"Data fetching error for {ticker}: {e}")
-        return pd.DataFrame()
+        return empty_result
+
+    if data.empty: return empty_result
+
+    # --- Robust Price Column Selection ---
+    price_column = 'Adj Close' if 'Adj Close' in data.columns else 'Close'
+    close_prices = data[price_column].to_numpy(dtype=np.float32).ravel()
+    close_prices = np.ascontiguousarray(close_prices[~np.isnan(close_prices)])
 
-def calculate_max_drawdown(series):
-    """Calculates Maximum Drawdown (MDD) as a percentage."""
-    cumulative_returns = (1 + series.pct_change().dropna()).cumprod()
-    peak = cumulative_returns.expanding(min_periods=1).max()
-    drawdown = (cumulative_returns / peak) - 1
-    return drawdown.min() * 100
+    # Only the four OHLC columns are cached for the chart; Adj Close and Volume are dropped
+    return data[['Open', 'High', 'Low', 'Close']], close_prices
+
+def calculate_max_drawdown(prices):
+    """Calculates Maximum Drawdown (MDD) as a percentage from a NaN-free price array."""
+    return float(max_drawdown(prices))
+
+@st.cache_data(max_entries=32)
+def calculate_moving_average(close_bytes, window):
+    """Calculates the moving average of raw float64 close prices; cached per (prices, window)."""
+    return rolling_mean(np.frombuffer(close_bytes, dtype=np.float64), window)
 
 # --- Streamlit Page Configuration ---
 st.set_page_config(
@@ -79,34 +102,33 @@ st.markdown("---")
 
 
 # --- Fetch Data ---
-data_df = get_historical_data(selected_ticker, start_date, end_date)
+# OHLC frame for the chart; all metrics below work on the compact (Adjusted) Close array
+data_df, price_array = get_historical_data(selected_ticker, start_date, end_date)
 
 if data_df.empty:
     st.error("Could not fetch data for the selected asset in the specified range.")
     st.stop()
 
-# --- Robust Price Column Selection ---
-price_column = 'Adj Close' if 'Adj Close' in data_df.columns else 'Close'
-close_prices = data_df[price_column]
-# ------------------------------------
+if price_array.size == 0:
+    st.error("No valid closing prices for the selected asset in the specified range.")
+    st.stop()
 
 # --- Core Metric Cards (4 columns) ---
 st.subheader("📊 Key Performance Metrics")
 col1, col2, col3, col4 = st.columns(4)
 
 # 1. Total Return Calculation (FIX: Explicitly convert to float)
-initial_price = float(close_prices.iloc[0])
-final_price = float(close_prices.iloc[-1]) # FIX: This now ensures final_price is a float.
+initial_price = float(price_array[0])
+final_price = float(price_array[-1]) # FIX: This now ensures final_price is a float.
 total_return = (final_price / initial_price - 1) * 100
 total_return = float(total_return) # Ensure final result is float
 
 # 2. Volatility (Annualized Standard Deviation) (FIX: Explicitly convert to float)
-daily_change = close_prices.pct_change().dropna()
-annualized_volatility = float(np.std(daily_change) * np.sqrt(252) * 100)
+daily_change = np.diff(price_array) / price_array[:-1]
+annualized_volatility = float(daily_change.std() * np.sqrt(252) * 100)
 
 # 3. Maximum Drawdown (FIX: Explicitly convert to float)
-max_dd_series = calculate_max_drawdown(close_prices)
-max_dd = float(max_dd_series)
+max_dd = calculate_max_drawdown(price_array)
 
 # Display Metrics
 col1.metric(
@@ -136,7 +158,8 @@ st.markdown("---")
 # --- Professional Visualization: Interactive Candlestick Chart (Plotly) ---
 
 # Calculate Moving Average 
-data_df['MA'] = data_df['Close'].rolling(window=window_ma).mean()
+close_bytes = data_df['Close'].to_numpy(dtype=np.float64).ravel().tobytes()
+data_df['MA'] = calculate_moving_average(close_bytes, window_ma)
 
 st.subheader(f"📈 {selected_asset_name} Price Action and {window_ma}-Day MA")
 
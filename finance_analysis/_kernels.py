@@ -0,0 +1,78 @@
+import numpy as np
+
+# --- Numba-compiled price kernels (vectorized NumPy versions if Numba is not installed) ---
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True)
+    def rolling_mean(values, window):
+        """Rolling mean over `window` points using a running sum (NaN until the window is full)."""
+        n = len(values)
+        result = np.full(n, np.nan)
+        window_sum = 0.0
+        valid_count = 0
+
+        for i in range(n):
+            if not np.isnan(values[i]):
+                window_sum += values[i]
+                valid_count += 1
+            if i >= window:
+                dropped = values[i - window]
+                if not np.isnan(dropped):
+                    window_sum -= dropped
+                    valid_count -= 1
+            if valid_count == window:
+                result[i] = window_sum / window
+
+        return result
+
+    @njit(cache=True)
+    def max_drawdown(prices):
+        """Maximum Drawdown (MDD) as a percentage, from a NaN-free price array in one pass."""
+        if len(prices) < 2:
+            return np.nan
+
+        # The peak starts at the first return, matching the compounded-returns definition
+        peak = prices[1]
+        worst = 0.0
+        for i in range(1, len(prices)):
+            if prices[i] > peak:
+                peak = prices[i]
+            drawdown = prices[i] / peak - 1
+            if drawdown < worst:
+                worst = drawdown
+
+        return worst * 100
+
+else:
+    def rolling_mean(values, window):
+        """Rolling mean over `window` points from cumulative sums (NaN until the window is full)."""
+        values = np.asarray(values, dtype=np.float64)
+        result = np.full(len(values), np.nan)
+        if window > len(values):
+            return result
+
+        valid = ~np.isnan(values)
+        window_sums = np.cumsum(np.where(valid, values, 0.0))
+        window_counts = np.cumsum(valid)
+        window_sums[window:] = window_sums[window:] - window_sums[:-window]
+        window_counts[window:] = window_counts[window:] - window_counts[:-window]
+
+        full = window_counts[window - 1:] == window
+        result[window - 1:][full] = window_sums[window - 1:][full] / window
+        return result
+
+    def max_drawdown(prices):
+        """Maximum Drawdown (MDD) as a percentage, from a NaN-free price array."""
+        if len(prices) < 2:
+            return np.nan
+
+        # The peak starts at the first return, matching the compounded-returns definition
+        prices = prices[1:]
+        peak = np.maximum.accumulate(prices)
+        return (prices / peak - 1).min() * 100
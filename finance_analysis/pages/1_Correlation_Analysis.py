@@ -2,8 +2,8 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import yfinance as yf
+from curl_cffi import requests as curl_requests
 import plotly.express as px
-from scipy.stats import spearmanr
 from datetime import date, timedelta
 
 # --- CONSTANTS and HELPER FUNCTIONS (Integrated for stability) ---
@@ -18,13 +18,39 @@ TICKERS = {
     'Tesla (Stock)': 'TSLA'
 }
 
+MAX_TICKERS_PER_REQUEST = 20
 
-@st.cache_data
+
+@st.cache_resource
+def get_yf_session():
+    """Creates one HTTP session that is reused by all Yahoo Finance requests across reruns."""
+    # yfinance only accepts curl_cffi sessions; plain requests sessions are rejected
+    return curl_requests.Session(impersonate="chrome")
+
+
+def download_in_batches(symbols, start_date, end_date):
+    """Downloads price data in batches of up to MAX_TICKERS_PER_REQUEST symbols."""
+    download_kwargs = dict(start=start_date, end=end_date, progress=False,
+                           threads=True, group_by='column', auto_adjust=False,
+                           session=get_yf_session())
+    # yfinance threads within a batch; batches run one after another because
+    # concurrent yf.download calls share (and reset) its global result store.
+    batches = [symbols[i:i + MAX_TICKERS_PER_REQUEST]
+               for i in range(0, len(symbols), MAX_TICKERS_PER_REQUEST)]
+    frames = [yf.download(batch, **download_kwargs) for batch in batches]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames: return pd.DataFrame()
+    return frames[0] if len(frames) == 1 else pd.concat(frames, axis=1)
+
+
+@st.cache_data(max_entries=8, ttl=3600)
 def get_multiple_adj_close_data(tickers, start_date, end_date):
     """Fetches Adjusted Close price data for multiple assets, falling back to Close."""
+    # Tickers arrive as sorted (name, symbol) pairs so selection order does not split the cache
+    tickers = dict(tickers)
     try:
         # Download data for all ticker symbols
-        data = yf.download(list(tickers.values()), start=start_date, end=end_date, progress=False)
+        data = download_in_batches(list(tickers.values()), start_date, end_date)
 
         if data.empty: return pd.DataFrame()
 
@@ -45,6 +71,12 @@ def get_multiple_adj_close_data(tickers, start_date, end_date):
         return pd.DataFrame()
 
 
+@st.cache_data(max_entries=8, ttl=3600)
+def get_rank_matrix(df):
+    """Ranks each asset's prices (average ties); cached so method toggles skip the re-sort."""
+    return df.rank(method='average').to_numpy()
+
+
 def calculate_correlation(df, method='pearson'):
     """Calculates the correlation matrix using specified method (Pearson or Spearman)."""
     if method == 'spearman':
@@ -52,9 +84,9 @@ def calculate_correlation(df, method='pearson'):
         if df_cleaned.empty:
             return pd.DataFrame(index=df.columns, columns=df.columns)
 
-        corr_matrix, _ = spearmanr(df_cleaned, axis=0)
-        corr_df = pd.DataFrame(corr_matrix, index=df_cleaned.columns, columns=df_cleaned.columns)
-        return corr_df
+        # Spearman is Pearson on the ranks; skips scipy's p-value computation
+        corr_matrix = np.corrcoef(get_rank_matrix(df_cleaned), rowvar=False)
+        return pd.DataFrame(corr_matrix, index=df_cleaned.columns, columns=df_cleaned.columns)
     else:  # Pearson (default)
         return df.corr(method=method)
 
@@ -96,7 +128,7 @@ if len(selected_assets) < 2:
 
 # Filter Tickers for selected assets
 filtered_tickers = {k: TICKERS[k] for k in selected_assets}
-data_df = get_multiple_adj_close_data(filtered_tickers, start_date, end_date)
+data_df = get_multiple_adj_close_data(tuple(sorted(filtered_tickers.items())), start_date, end_date)
 
 if data_df.empty or len(data_df.columns) < 2:
     st.error("Could not fetch sufficient data for the selected assets or period.")
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import yfinance as yf
+from curl_cffi import requests as curl_requests
 import plotly.express as px
 from datetime import date, timedelta
 
@@ -17,12 +18,38 @@ TICKERS = {
     'Tesla (Stock)': 'TSLA'
 }
 
+MAX_TICKERS_PER_REQUEST = 20
 
-@st.cache_data
+
+@st.cache_resource
+def get_yf_session():
+    """Creates one HTTP session that is reused by all Yahoo Finance requests across reruns."""
+    # yfinance only accepts curl_cffi sessions; plain requests sessions are rejected
+    return curl_requests.Session(impersonate="chrome")
+
+
+def download_in_batches(symbols, start_date, end_date):
+    """Downloads price data in batches of up to MAX_TICKERS_PER_REQUEST symbols."""
+    download_kwargs = dict(start=start_date, end=end_date, progress=False,
+                           threads=True, group_by='column', auto_adjust=False,
+                           session=get_yf_session())
+    # yfinance threads within a batch; batches run one after another because
+    # concurrent yf.download calls share (and reset) its global result store.
+    batches = [symbols[i:i + MAX_TICKERS_PER_REQUEST]
+               for i in range(0, len(symbols), MAX_TICKERS_PER_REQUEST)]
+    frames = [yf.download(batch, **download_kwargs) for batch in batches]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames: return pd.DataFrame()
+    return frames[0] if len(frames) == 1 else pd.concat(frames, axis=1)
+
+
+@st.cache_data(max_entries=8, ttl=3600)
 def get_multiple_adj_close_data(tickers, start_date, end_date):
     """Fetches Adjusted Close price data for multiple assets, falling back to Close."""
+    # Tickers arrive as sorted (name, symbol) pairs so selection order does not split the cache
+    tickers = dict(tickers)
     try:
-        data = yf.download(list(tickers.values()), start=start_date, end=end_date, progress=False)
+        data = download_in_batches(list(tickers.values()), start_date, end_date)
 
         if data.empty: return pd.DataFrame()
 
@@ -40,25 +67,38 @@ def get_multiple_adj_close_data(tickers, start_date, end_date):
         return pd.DataFrame()
 
 
-def calculate_max_drawdown(series):
-    """Calculates Maximum Drawdown (MDD) as a percentage."""
-    cumulative_returns = (1 + series.pct_change().dropna()).cumprod()
-    peak = cumulative_returns.expanding(min_periods=1).max()
-    drawdown = (cumulative_returns / peak) - 1
-    return drawdown.min() * 100
+def calculate_daily_returns(prices):
+    """Calculates daily returns for every asset column, skipping each asset's missing days."""
+    # float32 is ample for daily price data and halves the memory the reductions stream through
+    filled = prices.ffill().to_numpy(dtype=np.float32)
+    daily_returns = filled[1:] / filled[:-1] - 1
+    daily_returns[np.isnan(prices.to_numpy(dtype=np.float32)[1:])] = np.nan
+    return daily_returns
+
 
+def calculate_max_drawdown(daily_returns):
+    """Calculates Maximum Drawdown (MDD) as a percentage for every asset column."""
+    if daily_returns.shape[0] == 0:
+        # A single trading day has no returns (the old per-asset loop showed NaN)
+        return np.full(daily_returns.shape[1], np.nan)
+
+    cumulative_returns = np.nancumprod(1 + daily_returns, axis=0)
+    # Rows before an asset's first return are not part of its history
+    started = np.logical_or.accumulate(~np.isnan(daily_returns), axis=0)
+    cumulative_returns[~started] = np.nan
+    peak = np.fmax.accumulate(cumulative_returns, axis=0)
+    drawdown = (cumulative_returns / peak) - 1
+    return np.nanmin(drawdown, axis=0) * 100
 
-def calculate_sharpe_ratio(series, risk_free_rate=0.04):
-    """Calculates the Sharpe Ratio (Risk-Adjusted Return)."""
-    daily_returns = series.pct_change().dropna()
-    annualized_return = daily_returns.mean() * 252
-    annualized_volatility = daily_returns.std() * np.sqrt(252)
 
-    if annualized_volatility == 0:
-        return 0.0
+def calculate_sharpe_ratio(daily_returns, risk_free_rate=0.04):
+    """Calculates the Sharpe Ratio (Risk-Adjusted Return) for every asset column."""
+    annualized_return = np.nanmean(daily_returns, axis=0) * 252
+    annualized_volatility = np.nanstd(daily_returns, axis=0, ddof=1) * np.sqrt(252)
 
-    sharpe_ratio = (annualized_return - risk_free_rate) / annualized_volatility
-    return sharpe_ratio
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe_ratio = (annualized_return - risk_free_rate) / annualized_volatility
+    return np.where(annualized_volatility == 0, 0.0, sharpe_ratio)
 
 
 # --- Page Settings ---
@@ -101,38 +141,35 @@ if len(selected_assets) < 1:
 
 # Filter Tickers for selected assets
 filtered_tickers = {k: TICKERS[k] for k in selected_assets}
-data_df = get_multiple_adj_close_data(filtered_tickers, start_date, end_date)
+data_df = get_multiple_adj_close_data(tuple(sorted(filtered_tickers.items())), start_date, end_date)
 
 if data_df.empty:
     st.error("Could not fetch data for the selected assets.")
     st.stop()
 
 # --- Metric Calculation and Results Table ---
-results = []
-for column in data_df.columns:
-    # Ensure data is numeric
-    asset_series = pd.to_numeric(data_df[column], errors='coerce').dropna()
-    if asset_series.empty: continue
-
-    # Calculate metrics, ensuring they are simple floats for the table
-    sharpe = float(calculate_sharpe_ratio(asset_series, risk_free_rate))
-    mdd = float(calculate_max_drawdown(asset_series))
-
-    # Calculate Annualized Return
-    total_return = (asset_series.iloc[-1] / asset_series.iloc[0] - 1) * 100
-    days_diff = (end_date - start_date).days
-    if days_diff == 0: days_diff = 1
-    annualized_return = float(((1 + total_return / 100) ** (365 / days_diff) - 1) * 100)
-
-    results.append({
-        'Asset': column,
-        f'Sharpe Ratio (RFR={risk_free_rate_input}%)': f"{sharpe:.2f}",
-        'Annualized Return (%)': f"{annualized_return:.2f}",
-        'Maximum Drawdown (MDD) (%)': f"{mdd:.2f}",
-        'Sharpe_Sort': sharpe
-    })
-
-results_df = pd.DataFrame(results).sort_values(by='Sharpe_Sort', ascending=False)
+# All assets are processed at once; assets without any price data are skipped
+prices = data_df.dropna(axis=1, how='all')
+daily_returns = calculate_daily_returns(prices)
+
+sharpe = calculate_sharpe_ratio(daily_returns, risk_free_rate)
+mdd = calculate_max_drawdown(daily_returns)
+
+# Calculate Annualized Return from each asset's first and last available price
+first_prices = prices.bfill().to_numpy(dtype=np.float32)[0]
+last_prices = prices.ffill().to_numpy(dtype=np.float32)[-1]
+total_return = (last_prices / first_prices - 1) * 100
+days_diff = (end_date - start_date).days
+if days_diff == 0: days_diff = 1
+annualized_return = ((1 + total_return / 100) ** (365 / days_diff) - 1) * 100
+
+results_df = pd.DataFrame({
+    'Asset': prices.columns,
+    f'Sharpe Ratio (RFR={risk_free_rate_input}%)': [f"{value:.2f}" for value in sharpe],
+    'Annualized Return (%)': [f"{value:.2f}" for value in annualized_return],
+    'Maximum Drawdown (MDD) (%)': [f"{value:.2f}" for value in mdd],
+    'Sharpe_Sort': sharpe
+}).sort_values(by='Sharpe_Sort', ascending=False)
 results_df = results_df.drop(columns=['Sharpe_Sort'])  # Remove numerical column
 
 st.subheader("📚 Comparative Risk Metrics Table")
@@ -47,16 +47,17 @@ min_value_b = st.sidebar.slider(
     step=1
 )
 
+all_categories = df["Category"].unique().tolist()
 selected_categories = st.sidebar.multiselect(
     "Select Categories:",
-    options = df["Category"].unique(),
-    default = df["Category"].unique()
+    options = all_categories,
+    default = all_categories
 )
 
-filtered_df = df[
-    (df["Value_B"] >= min_value_b) &
-    (df["Category"].isin(selected_categories))
-]
+value_b = df["Value_B"].to_numpy()
+categories = df["Category"].to_numpy()
+mask = (value_b >= min_value_b) & np.isin(categories, selected_categories)
+filtered_df = df.iloc[mask]
 
 st.subheader("Time Series Chart for Value A")
 
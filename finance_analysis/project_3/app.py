@@ -10,25 +10,29 @@ st.set_page_config(
     initial_sidebar_state = "expanded",
 )
 
-@st.cache_data
+@st.cache_data(max_entries=8, ttl=3600)
 def generate_sales_data(start_date=datetime(2023,1,1), days =365, seed=42):
     np.random.seed(seed)
 
     dates = [start_date + timedelta(days=i) for i in range(days)]
 
+    products = ['Laptop', 'Monitor', 'Keyboard', 'Mouse', 'Webcam']
+    product_multipliers = np.array([4, 2, 0.5, 0.2, 0.8])
+
     data = {
         'Date' : dates,
         'Region' : np.random.choice(['North', 'South', 'East', 'West'], days),
-        'Product' : np.random.choice(['Laptop', 'Monitor', 'Keyboard', 'Mouse', 'Webcam'], days, p = [0.3,0.25,0.2,0.15,0.1]),
+        'Product' : np.random.choice(len(products), days, p = [0.3,0.25,0.2,0.15,0.1]),
         'Revenue' : np.random.normal(loc=1500, scale=800, size=days) * np.random.rand(days) * 2,
         'Units_Sold' : np.random.randint(1, 10, days)
     }
 
-    df = pd.DataFrame(data)
+    # Products are drawn as category codes, so the multipliers are a plain array lookup
+    product_codes = data['Product']
+    data['Product'] = pd.Categorical.from_codes(product_codes, products)
+    data['Revenue'] = np.abs(data['Revenue']) * product_multipliers[product_codes]
 
-    df['Revenue'] = df['Revenue'].abs()
-    product_multipliers = {'Laptop': 4, 'Monitor': 2, 'Keyboard': 0.5, 'Mouse': 0.2, 'Webcam': 0.8}
-    df["Revenue"] = df.apply(lambda row: row['Revenue'] * product_multipliers[row['Product']], axis = 1)
+    df = pd.DataFrame(data)
 
     return df.sort_values('Date').reset_index(drop=True)
 
@@ -50,17 +54,21 @@ date_range = st.sidebar.slider(
 start_date_filter = datetime.combine(date_range[0], datetime.min.time())
 end_date_filter = datetime.combine(date_range[1], datetime.max.time())
 
+all_regions = df["Region"].unique().tolist()
 selected_regions = st.sidebar.multiselect(
     'Select Regions:',
-    options = df["Region"].unique(),
-    default= df["Region"].unique()
+    options = all_regions,
+    default= all_regions
 )
 
-filtered_df = df[
-    (df['Date'] >= start_date_filter) &
-    (df['Date'] <= end_date_filter) &
-    (df['Region'].isin(selected_regions))
-]
+dates = df['Date'].to_numpy()
+regions = df['Region'].to_numpy()
+mask = (
+    (dates >= np.datetime64(start_date_filter)) &
+    (dates <= np.datetime64(end_date_filter)) &
+    np.isin(regions, selected_regions)
+)
+filtered_df = df.iloc[mask]
 
 if filtered_df.empty:
     st.error("No data available for the selected filters. Please adjust your criteria.")
@@ -105,7 +113,7 @@ chart_col1, chart_col2 = st.columns(2)
 
 with chart_col1:
     st.markdown("##### Revenue Trend")
-    daily_revenue = filtered_df.groupby(pd.to_datetime(filtered_df['Date'].dt.date))['Revenue'].sum().reset_index()
+    daily_revenue = filtered_df.groupby(filtered_df['Date'].dt.floor('D'))['Revenue'].sum().reset_index()
     daily_revenue.columns = ['Date', 'Total Revenue']
 
     chart_line = alt.Chart(daily_revenue).mark_line(point=True).encode(
@@ -120,7 +128,7 @@ with chart_col1:
 
 with chart_col2:
     st.markdown("##### Revenue by Product")
-    product_revenue = filtered_df.groupby('Product')['Revenue'].sum().reset_index()
+    product_revenue = filtered_df.groupby('Product', observed=True)['Revenue'].sum().reset_index()
     product_revenue.columns = ['Product', 'Total Revenue']
 
     chart_bar = alt.Chart(product_revenue).mark_bar().encode(
@@ -1,49 +1,78 @@
 import streamlit as st
-from PIL import Image, ImageEnhance, ImageFilter
+from PIL import Image, ImageFilter
 import numpy as np
 import io
 
+try:
+    import cv2  # Optional: SIMD-accelerated filters; Pillow is used when missing
+except ImportError:
+    cv2 = None
+
 
 # --- Image Processing Functions ---
 # All advanced logic is contained within a single file.
 
-def apply_grayscale(img):
-    """Converts the image to grayscale."""
-    return img.convert("L")
+def apply_grayscale(img_array):
+    """Converts an RGB array to grayscale."""
+    if cv2 is not None:
+        return cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+    return np.array(Image.fromarray(img_array).convert("L"))
+
+
+def apply_blur(img_array, radius):
+    """Applies a Gaussian blur filter (radius = standard deviation) to the array."""
+    if radius <= 0:
+        return img_array
+    if cv2 is not None:
+        # (0, 0) lets OpenCV size the kernel from sigma, like Pillow's full-width blur
+        return cv2.GaussianBlur(img_array, (0, 0), radius)
+    return np.array(Image.fromarray(img_array).filter(ImageFilter.GaussianBlur(radius)))
+
 
+# Rec. 601 luma weights, as used by Pillow's convert("L")
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114])
 
-def apply_blur(img, radius):
-    """Applies a Gaussian blur filter to the image."""
-    if radius > 0:
-        return img.filter(ImageFilter.GaussianBlur(radius))
-    return img
 
+def build_lut(brightness, contrast, histogram=None):
+    """Builds one 256-entry uint8 table applying brightness, then contrast (as ImageEnhance does)."""
+    lut = np.clip(np.arange(256) * brightness, 0, 255).astype(np.uint8)
+    if contrast != 1.0:
+        # Contrast pivots on the mean gray level of the brightened image
+        channel_hist = np.asarray(histogram, dtype=np.float64).reshape(3, 256)
+        channel_means = channel_hist @ lut / channel_hist.sum(axis=1)
+        mean = int(channel_means @ LUMA_WEIGHTS + 0.5)
+        lut = np.clip(mean + (lut.astype(np.float64) - mean) * contrast, 0, 255).astype(np.uint8)
+    return lut
 
-def adjust_brightness(img, factor):
-    """Adjusts the brightness of the image."""
-    enhancer = ImageEnhance.Brightness(img)
-    return enhancer.enhance(factor)
 
+# Same 3x3 kernel as Pillow's ImageFilter.FIND_EDGES
+EDGE_KERNEL = np.array([[-1, -1, -1], [-1, 8, -1], [-1, -1, -1]], dtype=np.float32)
 
-def adjust_contrast(img, factor):
-    """Adjusts the contrast of the image."""
-    enhancer = ImageEnhance.Contrast(img)
-    return enhancer.enhance(factor)
 
+def apply_edge_detection(img_array):
+    """Applies an edge detection filter (FIND_EDGES kernel) to an RGB or grayscale array."""
+    if cv2 is not None:
+        edges = cv2.filter2D(img_array, -1, EDGE_KERNEL)
+        # Pillow leaves the one-pixel border unfiltered
+        edges[[0, -1]] = img_array[[0, -1]]
+        edges[:, [0, -1]] = img_array[:, [0, -1]]
+        return edges
+    return np.array(Image.fromarray(img_array).filter(ImageFilter.FIND_EDGES))
 
-def apply_edge_detection(img):
-    """Applies an edge detection filter (FIND_EDGES)."""
-    return img.filter(ImageFilter.FIND_EDGES)
 
+def apply_color_inversion(img_array):
+    """Inverts the colors of an RGB uint8 array in place (Negative effect)."""
+    # ~x == 255 - x for uint8, without an int64 temporary
+    np.bitwise_not(img_array, out=img_array)
+    return img_array
 
-def apply_color_inversion(img):
-    """Inverts the colors of the image (Negative effect)."""
-    # Convert the image to a NumPy array
-    img_array = np.array(img.convert("RGB"))
-    # Invert each pixel value (255 - current value)
-    inverted_array = 255 - img_array
-    # Convert back to a PIL image
-    return Image.fromarray(inverted_array.astype('uint8'), 'RGB')
+
+# Download formats: Pillow format name -> (file extension, encoder options)
+DOWNLOAD_FORMATS = {
+    "WEBP": ("webp", {"quality": 90, "method": 4}),
+    "JPEG": ("jpg", {"quality": 90}),
+    "PNG": ("png", {}),
+}
 
 
 # --- Streamlit App Interface ---
@@ -76,7 +105,6 @@ def main():
 
     # Process the image if uploaded
     original_img = Image.open(uploaded_file)
-    processed_img = original_img.copy()
 
     st.sidebar.markdown("### Basic Adjustments")
 
@@ -94,29 +122,38 @@ def main():
     edge_detect = st.sidebar.checkbox("Detect Edges", value=False)
     invert_colors = st.sidebar.checkbox("Invert Colors (Negative)", value=False)
 
+    st.sidebar.markdown("### Download")
+
+    # WebP encodes several times faster than PNG at similar visual quality
+    download_format = st.sidebar.selectbox("Download Format", list(DOWNLOAD_FORMATS.keys()))
+
     # --- Image Processing Pipeline ---
 
-    # 1. Apply brightness and contrast
-    if brightness_factor != 1.0:
-        processed_img = adjust_brightness(processed_img, brightness_factor)
+    # Work on a single uint8 RGB buffer through the whole pipeline
+    rgb_img = original_img.convert("RGB")
+    img_array = np.array(rgb_img)
 
-    if contrast_factor != 1.0:
-        processed_img = adjust_contrast(processed_img, contrast_factor)
+    # 1. Apply brightness and contrast in a single table lookup
+    if brightness_factor != 1.0 or contrast_factor != 1.0:
+        histogram = rgb_img.histogram() if contrast_factor != 1.0 else None
+        img_array = build_lut(brightness_factor, contrast_factor, histogram)[img_array]
 
     # 2. Apply special filters
     if invert_colors:
-        processed_img = apply_color_inversion(processed_img)
+        img_array = apply_color_inversion(img_array)
 
     if grayscale:
-        processed_img = apply_grayscale(processed_img)
+        img_array = apply_grayscale(img_array)
 
     if edge_detect:
         # Edge detection is typically applied last
-        processed_img = apply_edge_detection(processed_img)
+        img_array = apply_edge_detection(img_array)
 
     # 3. Apply blur (usually the final step or based on desired order)
     if blur_radius > 0:
-        processed_img = apply_blur(processed_img, blur_radius)
+        img_array = apply_blur(img_array, blur_radius)
+
+    processed_img = Image.fromarray(img_array)
 
     # --- Display Results ---
 
@@ -132,20 +169,19 @@ def main():
 
         # --- Download Button (Advanced Feature) ---
 
-        # Save the image to an in-memory buffer
+        # Save the image to an in-memory buffer in the selected format
         buf = io.BytesIO()
-        # Get the original file format to maintain it on download
-        original_format = original_img.format if original_img.format else 'PNG'
+        file_extension, save_options = DOWNLOAD_FORMATS[download_format]
 
         try:
-            processed_img.save(buf, format=original_format)
+            processed_img.save(buf, format=download_format, **save_options)
             byte_im = buf.getvalue()
 
             st.download_button(
                 label="Download Processed Image",
                 data=byte_im,
-                file_name=f"processed_image.{original_format.lower()}",
-                mime=f"image/{original_format.lower()}",
+                file_name=f"processed_image.{file_extension}",
+                mime=f"image/{download_format.lower()}",
                 use_container_width=True
             )
         except Exception as e: